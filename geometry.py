@@ -1,6 +1,6 @@
 from typing import Union
-from collections import deque
-from math import atan2, cos, pi, sin
+from math import atan2, cos, hypot, pi, sin
+from operator import mul
 
 EPS = 1e-8  # 許容誤差
 DIGITS = 10  # 出力で表示する桁数
@@ -11,6 +11,8 @@ def equal(a, b):
 
 
 class Point:
+    __slots__ = ("x", "y")
+
     def __init__(self, x, y) -> None:
         self.x = x
         self.y = y
@@ -29,13 +31,13 @@ class Point:
         return Point(self.x / other, self.y / other)
 
     def __abs__(self) -> float:
-        return (self.x**2 + self.y**2) ** 0.5
+        return hypot(self.x, self.y)
 
     def __eq__(self, other: "Point") -> bool:
-        return equal(self.x, other.x) and equal(self.y, other.y)
+        return abs(self.x - other.x) < EPS and abs(self.y - other.y) < EPS
 
     def __ne__(self, other: "Point") -> bool:
-        return not (self == other)
+        return abs(self.x - other.x) >= EPS or abs(self.y - other.y) >= EPS
 
     def __str__(self) -> str:
         return f"{self.x:.{DIGITS}f} {self.y:.{DIGITS}f}"
@@ -65,6 +67,10 @@ class Point:
         """
         return self.x * other.y - self.y * other.x
 
+    def _norm2(self) -> float:
+        # 長さの2乗. 大小比較や2乗した値が必要な場合は平方根を取らずに済む
+        return self.x * self.x + self.y * self.y
+
     def move(self, dx, dy) -> "Point":
         """平行移動
 
@@ -87,13 +93,17 @@ class Point:
         Returns:
             Point: 移動後の座標
         """
-        if origin is None:
-            origin = Point(0, 0)
-        relative = self - origin
-        return origin + Point(
-            relative.x * cos(theta) - relative.y * sin(theta),
-            relative.x * sin(theta) + relative.y * cos(theta),
-        )
+        ox, oy = (0, 0) if origin is None else (origin.x, origin.y)
+        dx, dy = self.x - ox, self.y - oy
+        # よく使う角度は三角関数を使わずに座標の入れ替えで計算する
+        if theta == pi / 2:
+            return Point(ox - dy, oy + dx)
+        if theta == -pi / 2:
+            return Point(ox + dy, oy - dx)
+        if theta == pi:
+            return Point(ox - dx, oy - dy)
+        c, s = cos(theta), sin(theta)
+        return Point(ox + dx * c - dy * s, oy + dx * s + dy * c)
 
     def copy(self) -> "Point":
         return Point(self.x, self.y)
@@ -107,12 +117,8 @@ class Point:
         Returns:
             int: (self から見て other が) 1: 反時計回り, -1: 時計回り, 0: 直線上
         """
-        if equal(self.cross(other), 0):
-            return 0
-        elif self.cross(other) < 0:
-            return -1
-        else:
-            return 1
+        cross = self.cross(other)
+        return (cross >= EPS) - (cross <= -EPS)
 
     def unit_vector(self) -> "Point":
         """単位ベクトルを取得
@@ -120,22 +126,64 @@ class Point:
         Returns:
             Point: 同じ方向の単位ベクトル
         """
-        if equal(abs(self), 0):
+        norm = abs(self)
+        if equal(norm, 0):
             return Point(0, 0)
-        return self / abs(self)
+        return Point(self.x / norm, self.y / norm)
+
+    @staticmethod
+    def direction(a: "Point", b: "Point") -> "Point":
+        """a から b へ向かう単位ベクトル. (b - a).unit_vector() と同じ
+
+        Args:
+            a (Point): 始点
+            b (Point): 終点
+
+        Returns:
+            Point: 単位ベクトル. a と b が同じ点の場合は (0, 0)
+        """
+        dx, dy = b.x - a.x, b.y - a.y
+        norm = hypot(dx, dy)
+        if equal(norm, 0):
+            return Point(0, 0)
+        return Point(dx / norm, dy / norm)
 
 
 class Line:
+    __slots__ = ("_p1", "_p2", "_dx", "_dy", "_len2")
+
     def __init__(self, p1: Point, p2: Point) -> None:
         assert p1 != p2, "p1 and p2 must be different"
-        self.p1 = p1.copy()
-        self.p2 = p2.copy()
+        self._p1 = p1.copy()
+        self._p2 = p2.copy()
+        # 方向ベクトルとその長さの2乗は各メソッドで使い回す
+        self._dx = self._p2.x - self._p1.x
+        self._dy = self._p2.y - self._p1.y
+        self._len2 = self._dx**2 + self._dy**2
+
+    @property
+    def p1(self) -> Point:
+        """始点. 方向ベクトルを保持するので, 生成後は変更できない. 返り値はコピー
+
+        Returns:
+            Point: 始点の座標
+        """
+        return self._p1.copy()
+
+    @property
+    def p2(self) -> Point:
+        """終点. 方向ベクトルを保持するので, 生成後は変更できない. 返り値はコピー
+
+        Returns:
+            Point: 終点の座標
+        """
+        return self._p2.copy()
 
     def __str__(self) -> str:
-        return f"{self.p1} {self.p2}"
+        return f"{self._p1} {self._p2}"
 
     def format(self) -> str:
-        return f"{self.p1.format()} -- {self.p2.format()}"
+        return f"{self._p1.format()} -- {self._p2.format()}"
 
     def slope(self) -> float:
         """傾き
@@ -143,10 +191,10 @@ class Line:
         Returns:
             float: 直線の傾き, y軸に平行な場合は inf
         """
-        if equal(self.p1.x, self.p2.x):
+        if equal(self._p1.x, self._p2.x):
             return float("inf")
         else:
-            return (self.p2.y - self.p1.y) / (self.p2.x - self.p1.x)
+            return (self._p2.y - self._p1.y) / (self._p2.x - self._p1.x)
 
     def projection(self, p: Point) -> Point:
         """射影
@@ -157,8 +205,8 @@ class Line:
         Returns:
             Point: 移動後の座標
         """
-        base = self.p2 - self.p1
-        return self.p1 + base * (p - self.p1).dot(base) / abs(base) ** 2
+        t = ((p.x - self._p1.x) * self._dx + (p.y - self._p1.y) * self._dy) / self._len2
+        return Point(self._p1.x + self._dx * t, self._p1.y + self._dy * t)
 
     def reflection(self, p: Point) -> Point:
         """反射
@@ -169,7 +217,8 @@ class Line:
         Returns:
             Point: 反射後の座標
         """
-        return p + (self.projection(p) - p) * 2
+        projection = self.projection(p)
+        return Point(2 * projection.x - p.x, 2 * projection.y - p.y)
 
     def is_parallel(self, other: "Line") -> bool:
         """平行かどうか判定
@@ -180,7 +229,7 @@ class Line:
         Returns:
             bool: True: 平行, False: 平行でない
         """
-        return equal((self.p2 - self.p1).cross(other.p2 - other.p1), 0)
+        return equal(self._dx * other._dy - self._dy * other._dx, 0)
 
     def is_orthogonal(self, other: "Line") -> bool:
         """垂直かどうか判定
@@ -191,7 +240,7 @@ class Line:
         Returns:
             bool: True: 垂直, False: 垂直でない
         """
-        return equal((self.p2 - self.p1).dot(other.p2 - other.p1), 0)
+        return equal(self._dx * other._dx + self._dy * other._dy, 0)
 
     def is_including_point(self, p: Point) -> bool:
         """直線上に点 p が存在するかどうか
@@ -202,9 +251,9 @@ class Line:
         Returns:
             bool: True: 直線上に存在, False: 直線上に存在しない
         """
-        if self.p1 == p or self.p2 == p:
+        if self._p1 == p or self._p2 == p:
             return True
-        return (self.p2 - self.p1).ccw(p - self.p1) == 0
+        return equal(self._dx * (p.y - self._p1.y) - self._dy * (p.x - self._p1.x), 0)
 
     def is_crossing(self, other: Union["Line", "Segment"]) -> bool:
         """直線の交差判定
@@ -215,23 +264,27 @@ class Line:
         Returns:
             bool: True: 交差, False: 交差しない
         """
-        if type(other) == Line:
-            return self._is_crossing_line(other)
-        if type(other) == Segment:
+        if isinstance(other, Segment):
             return self._is_crossing_segment(other)
+        if isinstance(other, Line):
+            return self._is_crossing_line(other)
         raise ValueError("invalid type")
 
     def _is_crossing_line(self, other: "Line") -> bool:
-        if self.is_including_point(other.p1):
+        if self.is_including_point(other._p1):
             return True
         return not self.is_parallel(other)
 
     def _is_crossing_segment(self, other: "Segment") -> bool:
-        if self.is_including_point(other.p1) or self.is_including_point(other.p2):
+        # 線分の両端が直線の両側にあれば交差する
+        if self._side(other._p1) * self._side(other._p2) < 0:
             return True
-        ccw1 = (self.p2 - self.p1).ccw(other.p1 - self.p1)
-        ccw2 = (self.p2 - self.p1).ccw(other.p2 - self.p1)
-        return ccw1 * ccw2 < 0
+        return self.is_including_point(other._p1) or self.is_including_point(other._p2)
+
+    def _side(self, p: Point) -> int:
+        # (self.p2 - self.p1).ccw(p - self.p1) と同じ
+        cross = self._dx * (p.y - self._p1.y) - self._dy * (p.x - self._p1.x)
+        return (cross >= EPS) - (cross <= -EPS)
 
     def crossing_point(self, other: Union["Line", "Segment"]) -> Union[Point, None]:
         """他の直線との交点
@@ -242,13 +295,28 @@ class Line:
         Returns:
             Point | None: 交点の座標. 交差しない場合は None. 平行な場合も None
         """
-        if self.is_parallel(other) or not self.is_crossing(other):
+        d1 = self._dx * other._dy - self._dy * other._dx
+        if equal(d1, 0):
             return None
-        d1 = (self.p2 - self.p1).cross(other.p2 - other.p1)
-        d2 = (self.p2 - self.p1).cross(self.p2 - other.p1)
-        if equal(d1, 0) and equal(d2, 0):
-            return other.p1
-        return other.p1 + (other.p2 - other.p1) * (d2 / d1)
+        ex, ey = self._p1.x - other._p1.x, self._p1.y - other._p1.y
+        # 交点は self.p1 + (self.p2 - self.p1) * s = other.p1 + (other.p2 - other.p1) * t
+        t = (self._dx * ey - self._dy * ex) / d1
+        if isinstance(other, Segment):
+            in_range = self._is_on_segment_range(other, t)
+            if in_range and isinstance(self, Segment):
+                s = (other._dx * ey - other._dy * ex) / d1
+                in_range = self._is_on_segment_range(self, s)
+            # ほぼ平行で端点が誤差の範囲で相手に乗っている場合は, 範囲外でも交差とみなす.
+            # is_crossing と結果を揃えるため, そのときだけ改めて判定する
+            if not in_range and not self.is_crossing(other):
+                return None
+        return Point(other._p1.x + other._dx * t, other._p1.y + other._dy * t)
+
+    @staticmethod
+    def _is_on_segment_range(segment: "Segment", t: float) -> bool:
+        # segment.p1 + (segment.p2 - segment.p1) * t が線分の範囲内にあるか
+        length = segment._len2**0.5
+        return -EPS < t * length < length + EPS
 
     def distance_to_point(self, p: Point) -> float:
         """直線と点の距離
@@ -264,11 +332,13 @@ class Line:
 
 
 class Segment(Line):
+    __slots__ = ()
+
     def __init__(self, p1: Point, p2: Point) -> None:
         super().__init__(p1, p2)
 
     def __abs__(self) -> float:
-        return abs(self.p2 - self.p1)
+        return self._len2**0.5
 
     def bisecter(self) -> "Line":
         """垂直二等分線
@@ -276,10 +346,10 @@ class Segment(Line):
         Returns:
             Line: 計算結果の直線
         """
-        center = (self.p1 + self.p2) / 2
-        p1 = self.p1.rotate(pi / 2, center)
-        p2 = self.p2.rotate(pi / 2, center)
-        return Line(p1, p2)
+        # 両端点を中点の周りに 90 度回転させた2点を通る直線
+        mx, my = (self._p1.x + self._p2.x) / 2, (self._p1.y + self._p2.y) / 2
+        hx, hy = self._dx / 2, self._dy / 2
+        return Line(Point(mx + hy, my - hx), Point(mx - hy, my + hx))
 
     def is_including_point(self, p: Point) -> bool:
         """線分上に点 p が存在するかどうか
@@ -290,8 +360,9 @@ class Segment(Line):
         Returns:
             bool: True: 線分上に存在, False: 線分上に存在しない
         """
-        ref = (self.p2 - self.p1).dot(p - self.p1) / abs(self)
-        between = equal(ref, 0) or equal(ref, abs(self)) or 0 < ref < abs(self)
+        length = self._len2**0.5
+        ref = (self._dx * (p.x - self._p1.x) + self._dy * (p.y - self._p1.y)) / length
+        between = equal(ref, 0) or equal(ref, length) or 0 < ref < length
         return super().is_including_point(p) and between
 
     def is_crossing(self, other: Union["Line", "Segment"]) -> bool:
@@ -303,29 +374,26 @@ class Segment(Line):
         Returns:
             bool: True: 交差, False: 交差しない
         """
-        if type(other) == Line:
-            return self._is_crossing_line(other)
-        if type(other) == Segment:
+        if isinstance(other, Segment):
             return self._is_crossing_segment(other)
+        if isinstance(other, Line):
+            return self._is_crossing_line(other)
         raise ValueError("invalid type")
 
     def _is_crossing_line(self, other: "Line") -> bool:
         return other._is_crossing_line(self)
 
     def _is_crossing_segment(self, other: "Segment") -> bool:
-        if (
-            self.is_including_point(other.p1)
-            or self.is_including_point(other.p2)
-            or other.is_including_point(self.p1)
-            or other.is_including_point(self.p2)
-        ):
+        # 互いに相手の両端が異なる側にあれば交差する. 端点が相手の上にある場合も交差
+        split = self._side(other._p1) != self._side(other._p2)
+        if split and other._side(self._p1) != other._side(self._p2):
             return True
-
-        ccw1 = (self.p2 - self.p1).ccw(other.p1 - self.p1)
-        ccw2 = (self.p2 - self.p1).ccw(other.p2 - self.p1)
-        ccw3 = (other.p2 - other.p1).ccw(self.p1 - other.p1)
-        ccw4 = (other.p2 - other.p1).ccw(self.p2 - other.p1)
-        return ccw1 != ccw2 and ccw3 != ccw4
+        return (
+            self.is_including_point(other._p1)
+            or self.is_including_point(other._p2)
+            or other.is_including_point(self._p1)
+            or other.is_including_point(self._p2)
+        )
 
     def distance_to_point(self, p: Point) -> float:
         """線分と点の距離
@@ -336,10 +404,17 @@ class Segment(Line):
         Returns:
             float: 距離
         """
+        return self._sqdist_to_point(p) ** 0.5
+
+    def _sqdist_to_point(self, p: Point) -> float:
+        # 距離の2乗. 大小比較だけなら平方根を取らずに済む
         projection = self.projection(p)
         if self.is_including_point(projection):
-            return abs(p - projection)
-        return min(abs(self.p1 - p), abs(self.p2 - p))
+            return (p.x - projection.x) ** 2 + (p.y - projection.y) ** 2
+        return min(
+            (self._p1.x - p.x) ** 2 + (self._p1.y - p.y) ** 2,
+            (self._p2.x - p.x) ** 2 + (self._p2.y - p.y) ** 2,
+        )
 
     def distance_to_segment(self, other: "Segment") -> float:
         """線分と線分の距離
@@ -352,12 +427,13 @@ class Segment(Line):
         """
         if self.is_crossing(other):
             return 0
-        return min(
-            self.distance_to_point(other.p1),
-            self.distance_to_point(other.p2),
-            other.distance_to_point(self.p1),
-            other.distance_to_point(self.p2),
+        dist2 = min(
+            self._sqdist_to_point(other._p1),
+            self._sqdist_to_point(other._p2),
+            other._sqdist_to_point(self._p1),
+            other._sqdist_to_point(self._p2),
         )
+        return dist2**0.5
 
 
 class Polygon:
@@ -367,13 +443,64 @@ class Polygon:
         Args:
             points (list[Point]): 頂点を反時計回りに追加したリスト
         """
-        self.points = [points[0].copy()]
-        for p in points[1:]:
-            if self.points[-1] != p:
-                self.points.append(p.copy())
-        while self.points[-1] == self.points[0]:
-            self.points.pop()
-        self.n = len(self.points)
+        self._set_coords([p.x for p in points], [p.y for p in points])
+
+    @classmethod
+    def _from_coords(cls, xs: list[float], ys: list[float]) -> "Polygon":
+        polygon = cls.__new__(cls)
+        polygon._set_coords(xs, ys)
+        return polygon
+
+    def _set_coords(self, xs: list[float], ys: list[float]) -> None:
+        # 頂点は x 座標と y 座標の tuple で別々に保持する.
+        # 外接矩形や辺の情報を保持するので, 生成後は座標を変更できないようにしておく
+        rxs, rys = [xs[0]], [ys[0]]
+        for x, y in zip(xs[1:], ys[1:]):
+            if not (equal(rxs[-1], x) and equal(rys[-1], y)):
+                rxs.append(x)
+                rys.append(y)
+        while len(rxs) > 1 and equal(rxs[-1], rxs[0]) and equal(rys[-1], rys[0]):
+            rxs.pop()
+            rys.pop()
+        self._xs, self._ys = tuple(rxs), tuple(rys)
+        self.n = len(rxs)
+        # 外接矩形
+        self._xmin, self._xmax = min(rxs), max(rxs)
+        self._ymin, self._ymax = min(rys), max(rys)
+        self._edge_cache = None
+        self._points_cache = None
+
+    @property
+    def xs(self) -> tuple[float, ...]:
+        """頂点の x 座標. 変更はできない
+
+        Returns:
+            tuple[float, ...]: 頂点を反時計回りに並べた x 座標
+        """
+        return self._xs
+
+    @property
+    def ys(self) -> tuple[float, ...]:
+        """頂点の y 座標. 変更はできない
+
+        Returns:
+            tuple[float, ...]: 頂点を反時計回りに並べた y 座標
+        """
+        return self._ys
+
+    @property
+    def points(self) -> list[Point]:
+        """頂点のリスト. 初回のアクセスで生成して使い回すので, リストや各頂点は変更しないこと
+
+        Returns:
+            list[Point]: 頂点を反時計回りに並べたリスト
+        """
+        if self._points_cache is None:
+            self._points_cache = list(map(Point, self._xs, self._ys))
+        return self._points_cache
+
+    def _point(self, i: int) -> Point:
+        return Point(self._xs[i], self._ys[i])
 
     def __str__(self) -> str:
         return "\n".join([str(p) for p in self.points])
@@ -381,18 +508,35 @@ class Polygon:
     def format(self) -> str:
         return " -> ".join([p.format() for p in self.points])
 
+    def rotate(self, theta, origin: Point = None) -> "Polygon":
+        """全ての頂点を回転移動. 三角関数の計算は1回のみ. O(self.n)
+
+        Args:
+            theta (float): 回転する角度（ラジアン）
+            origin (Point, optional): 原点. Defaults to (0, 0).
+
+        Returns:
+            Polygon: 移動後の多角形
+        """
+        ox, oy = (0, 0) if origin is None else (origin.x, origin.y)
+        c, s = cos(theta), sin(theta)
+        xs = [ox + (x - ox) * c - (y - oy) * s for x, y in zip(self._xs, self._ys)]
+        ys = [oy + (x - ox) * s + (y - oy) * c for x, y in zip(self._xs, self._ys)]
+        return Polygon._from_coords(xs, ys)
+
     def area(self) -> float:
         """多角形内部の面積. O(self.n)
 
         Returns:
             float: 面積
         """
-        area = 0
-        for i in range(self.n):
-            p1 = self.points[i]
-            p2 = self.points[(i + 1) % self.n]
-            area += p1.cross(p2) / 2
-        return abs(area)
+        # 靴紐公式. 1つずらした配列との内積2回で計算する.
+        # 原点から遠い多角形で桁落ちしないよう, 先頭の頂点を原点に平行移動しておく
+        x0, y0 = self._xs[0], self._ys[0]
+        xs = [x - x0 for x in self._xs]
+        ys = [y - y0 for y in self._ys]
+        prev_xs, prev_ys = xs[-1:] + xs[:-1], ys[-1:] + ys[:-1]
+        return abs(sum(map(mul, prev_xs, ys)) - sum(map(mul, prev_ys, xs))) / 2
 
     def is_convex(self) -> bool:
         """凸多角形かどうか判定. O(self.n)
@@ -400,15 +544,23 @@ class Polygon:
         Returns:
             bool: True: 凸多角形, False: 凹多角形. 3点が一直線上にある場合も True
         """
-        top = 0
-        bottom = 0
+        xs, ys = self._xs, self._ys
+        top = False
+        bottom = False
         for i in range(self.n):
-            a = self.points[i]
-            b = self.points[(i + 1) % self.n]
-            c = self.points[(i + 2) % self.n]
-            top = max(top, (b - a).ccw(c - b))
-            bottom = min(bottom, (b - a).ccw(c - b))
-        return not (top == 1 and bottom == -1)
+            ax, ay = xs[i - 2], ys[i - 2]
+            bx, by = xs[i - 1], ys[i - 1]
+            cx, cy = xs[i], ys[i]
+            cross = (bx - ax) * (cy - by) - (by - ay) * (cx - bx)
+            if cross >= EPS:
+                top = True
+            elif cross <= -EPS:
+                bottom = True
+            else:
+                continue
+            if top and bottom:
+                return False
+        return True
 
     def side_of_point(self, p: Point) -> int:
         """多角形と点の位置関係を判定. O(self.n)
@@ -419,75 +571,138 @@ class Polygon:
         Returns:
             int: 1: 内部, 0: 線上, -1: 外部
         """
+        return self.side_of_points([p])[0]
 
-        theta = 0  # p の周りを何度周回するか
-        for i in range(self.n):
-            a = self.points[i]
-            b = self.points[(i + 1) % self.n]
-            if a == b == p:
-                return 0
-            if a == b:
-                continue
-            if Segment(a, b).is_including_point(p):
-                return 0
-            theta += atan2((a - p).cross(b - p), (a - p).dot(b - p))
-        return -1 if -pi < theta < pi else 1
+    def side_of_points(self, points: list[Point]) -> list[int]:
+        """多角形と複数の点の位置関係をまとめて判定. O(self.n * len(points))
 
-    def convex_hull(self) -> "Polygon":
-        """現在 self に含まれている点から構成される凸包を返す. O(self.n)
+        Args:
+            points (list[Point]): 判定対象の点のリスト
 
         Returns:
-            Polygon: 生成された凸包
+            list[int]: 各点について 1: 内部, 0: 線上, -1: 外部
         """
-        points = self.points
-        points.sort(key=lambda p: (p.y, p.x))
-
-        if self.n <= 2:
-            return Polygon(points)
-        elif self.n == 3:
-            if (points[1] - points[0]).ccw(points[2] - points[0]) < 0:
-                points = [points[0], points[2], points[1]]
-            return Polygon(points)
-
-        right = deque([points[0].copy(), points[1].copy()])
-        for i in range(2, self.n):
-            next = points[i].copy()
-            curr = right.pop()
-            prev = right.pop()
-            while True:
-                if (curr - prev).ccw(next - curr) >= 0:
-                    right.append(prev)
-                    right.append(curr)
-                    break
-                if len(right) == 0:
-                    right.append(prev)
-                    break
-                curr = prev.copy()
-                prev = right.pop()
-
-            right.append(next)
-
-        left = deque([points[self.n - 1].copy(), points[self.n - 2].copy()])
-        for i in range(self.n - 2)[::-1]:
-            next = points[i].copy()
-            curr = left.pop()
-            prev = left.pop()
-            while True:
-                if (curr - prev).ccw(next - curr) >= 0:
-                    left.append(prev)
-                    left.append(curr)
+        edges = self._edges()
+        res = []
+        for p in points:
+            px, py = p.x, p.y
+            if (
+                px < self._xmin - EPS
+                or px > self._xmax + EPS
+                or py < self._ymin - EPS
+                or py > self._ymax + EPS
+            ):
+                res.append(-1)
+                continue
+
+            side = -1
+            for ax, ay, dx, dy, by, length in edges:
+                rx, ry = px - ax, py - ay
+                if abs(rx) < EPS and abs(ry) < EPS:
+                    side = 0
                     break
-                if len(left) == 0:
-                    left.append(prev)
+                if length < EPS:
+                    continue
+                cross = dx * ry - dy * rx
+                if (
+                    abs(cross) < EPS
+                    and -EPS < (dx * rx + dy * ry) / length < length + EPS
+                ):
+                    side = 0
                     break
-                curr = prev.copy()
-                prev = left.pop()
+                # p から x 軸正方向に伸ばした半直線と辺が交わるたびに内外が反転する
+                if (ay > py) != (by > py) and rx < dx * ry / dy:
+                    side = -side
+            res.append(side)
+        return res
 
-            left.append(next)
+    def _edges(self) -> list[tuple[float, ...]]:
+        # 辺ごとの (始点 x, 始点 y, dx, dy, 終点 y, 長さ). 初回の呼び出し時に計算して保持する
+        if self._edge_cache is None:
+            xs, ys = self._xs, self._ys
+            self._edge_cache = []
+            for i in range(self.n):
+                ax, ay = xs[i - 1], ys[i - 1]
+                dx, dy = xs[i] - ax, ys[i] - ay
+                length = hypot(dx, dy)
+                self._edge_cache.append((ax, ay, dx, dy, ay + dy, length))
+        return self._edge_cache
+
+    def _hull_candidates(self) -> list[int]:
+        # Akl-Toussaint の前処理. 8方向の端点が作る八角形の真に内側にある点は
+        # 凸包に含まれないので除外し, 残りの頂点番号を返す
+        xs, ys = self._xs, self._ys
+        r = range(self.n)
+        diff = [x - y for x, y in zip(xs, ys)]
+        total = [x + y for x, y in zip(xs, ys)]
+        extremes = [
+            min(r, key=ys.__getitem__),
+            max(r, key=diff.__getitem__),
+            max(r, key=xs.__getitem__),
+            max(r, key=total.__getitem__),
+            max(r, key=ys.__getitem__),
+            min(r, key=diff.__getitem__),
+            min(r, key=xs.__getitem__),
+            min(r, key=total.__getitem__),
+        ]
+        edges = []
+        for k in range(8):
+            i, j = extremes[k - 1], extremes[k]
+            if not (equal(xs[i], xs[j]) and equal(ys[i], ys[j])):
+                edges.append((xs[i], ys[i], xs[j] - xs[i], ys[j] - ys[i]))
+        return [
+            k
+            for k in r
+            if not all(
+                dx * (ys[k] - ay) - dy * (xs[k] - ax) >= EPS for ax, ay, dx, dy in edges
+            )
+        ]
 
-        right.pop()
-        left.pop()
-        return Polygon(list(right) + list(left))
+    def convex_hull(self) -> "Polygon":
+        """現在 self に含まれている点から構成される凸包を返す. O(self.n)
+
+        Returns:
+            Polygon: 生成された凸包
+        """
+        xs, ys = self._xs, self._ys
+        candidates = self._hull_candidates() if self.n > 8 else range(self.n)
+        # (y, x) の辞書順. 安定ソートを x, y の順に2回行う
+        indices = sorted(candidates, key=xs.__getitem__)
+        indices.sort(key=ys.__getitem__)
+        order = []
+        # 重複した点は凸包に折り返しを作るので取り除く
+        for i in indices:
+            if not order or not (
+                equal(xs[i], xs[order[-1]]) and equal(ys[i], ys[order[-1]])
+            ):
+                order.append(i)
+
+        if len(order) == 3:
+            a, b, c = order
+            if (xs[b] - xs[a]) * (ys[c] - ys[a]) - (ys[b] - ys[a]) * (
+                xs[c] - xs[a]
+            ) <= -EPS:
+                order = [a, c, b]
+        if len(order) <= 3:
+            return Polygon._from_coords([xs[i] for i in order], [ys[i] for i in order])
+
+        def chain(indices: list[int]) -> list[int]:
+            # 時計回りに曲がる点を取り除きながら積む. 一直線上の点は残す
+            stack = []
+            for k in indices:
+                while len(stack) >= 2:
+                    i, j = stack[-2], stack[-1]
+                    cross = (xs[j] - xs[i]) * (ys[k] - ys[j]) - (ys[j] - ys[i]) * (
+                        xs[k] - xs[j]
+                    )
+                    if cross > -EPS:
+                        break
+                    stack.pop()
+                stack.append(k)
+            return stack
+
+        hull = chain(order)[:-1] + chain(order[::-1])[:-1]
+        return Polygon._from_coords([xs[i] for i in hull], [ys[i] for i in hull])
 
     def diameter(self) -> float:
         """多角形の直径（最遠点対）. O(self.n)
@@ -496,26 +711,31 @@ class Polygon:
             float: 直径
         """
         ch = self.convex_hull()
-        if ch.n == 2:
-            return abs(ch.points[0] - ch.points[1])
+        xs, ys, n = ch._xs, ch._ys, ch.n
+        if n == 2:
+            return hypot(xs[0] - xs[1], ys[0] - ys[1])
         i = j = 0
-        for k in range(ch.n):
-            if ch.points[k].x < ch.points[i].x:
+        for k in range(n):
+            if xs[k] < xs[i]:
                 i = k
-            if ch.points[k].x > ch.points[j].x:
+            if xs[k] > xs[j]:
                 j = k
+        # 辺ベクトルは先に求めておく
+        exs = [xs[k + 1 - n] - xs[k] for k in range(n)]
+        eys = [ys[k + 1 - n] - ys[k] for k in range(n)]
+        # 比較は距離の2乗で行い, 平方根は最後に1回だけ取る
         res = 0
         si, sj = i, j
         while i != sj or j != si:
-            res = max(res, abs(ch.points[i] - ch.points[j]))
-            vi = ch.points[(i + 1) % ch.n] - ch.points[i]
-            vj = ch.points[(j + 1) % ch.n] - ch.points[j]
-            if vi.cross(vj) < 0:
-                i = (i + 1) % ch.n
+            d2 = (xs[i] - xs[j]) ** 2 + (ys[i] - ys[j]) ** 2
+            if d2 > res:
+                res = d2
+            if exs[i] * eys[j] - eys[i] * exs[j] < 0:
+                i = (i + 1) % n
             else:
-                j = (j + 1) % ch.n
+                j = (j + 1) % n
 
-        return res
+        return res**0.5
 
     def convex_common(self, other: "Polygon") -> "Polygon":
         """凸多角形同士の共通部分. O(self.n * other.n)
@@ -525,28 +745,52 @@ class Polygon:
         """
         ch_self = self.convex_hull()
         ch_other = other.convex_hull()
-
-        points = []
-
-        for p in ch_self.points:
-            if ch_other.side_of_point(p) == 1:
-                points.append(p)
-
-        for p in ch_other.points:
-            if ch_self.side_of_point(p) == 1:
-                points.append(p)
-
-        for i in range(ch_self.n):
-            seg1 = Segment(ch_self.points[i], ch_self.points[(i + 1) % ch_self.n])
-            for j in range(ch_other.n):
-                seg2 = Segment(
-                    ch_other.points[j], ch_other.points[(j + 1) % ch_other.n]
-                )
-                if seg1.is_crossing(seg2):
-                    points.append(seg1.crossing_point(seg2))
-
-        polygon = Polygon(points)
-        return polygon.convex_hull()
+        n, m = ch_self.n, ch_other.n
+        self_sides = ch_self._edge_sides(ch_other)
+        other_sides = ch_other._edge_sides(ch_self)
+
+        xs, ys = [], []
+
+        # 相手の全ての辺に対して反時計回り側にある頂点は相手の内部にある
+        for i in range(n):
+            if all(row[i] == 1 for row in other_sides):
+                xs.append(ch_self._xs[i])
+                ys.append(ch_self._ys[i])
+
+        for j in range(m):
+            if all(row[j] == 1 for row in self_sides):
+                xs.append(ch_other._xs[j])
+                ys.append(ch_other._ys[j])
+
+        # 辺の両端が相手の辺の同じ側にある組は交差しないので先に除外する
+        for i in range(n):
+            seg1 = Segment(ch_self._point(i), ch_self._point((i + 1) % n))
+            for j in range(m):
+                if self_sides[i][j] * self_sides[i][(j + 1) % m] == 1:
+                    continue
+                if other_sides[j][i] * other_sides[j][(i + 1) % n] == 1:
+                    continue
+                seg2 = Segment(ch_other._point(j), ch_other._point((j + 1) % m))
+                if seg1._is_crossing_segment(seg2):
+                    p = seg1.crossing_point(seg2)
+                    xs.append(p.x)
+                    ys.append(p.y)
+
+        return Polygon._from_coords(xs, ys).convex_hull()
+
+    def _edge_sides(self, other: "Polygon") -> list[list[int]]:
+        # res[i][k]: 辺 i から見た other の頂点 k の回転方向 (Point.ccw と同じ)
+        xs, ys = self._xs, self._ys
+        res = []
+        for i in range(self.n):
+            ax, ay = xs[i], ys[i]
+            dx, dy = xs[(i + 1) % self.n] - ax, ys[(i + 1) % self.n] - ay
+            row = []
+            for x, y in zip(other._xs, other._ys):
+                cross = dx * (y - ay) - dy * (x - ax)
+                row.append((cross >= EPS) - (cross <= -EPS))
+            res.append(row)
+        return res
 
     def convex_cut_with_line(self, other: Line) -> "Polygon":
         """凸多角形を直線で切断. O(self.n)
@@ -557,16 +801,22 @@ class Polygon:
         Returns:
             Polygon: 切断後の反時計周り側の凸多角形
         """
-        points = []
+        xs, ys = self._xs, self._ys
+        ox, oy, dx, dy = other._p1.x, other._p1.y, other._dx, other._dy
+        crosses = [dx * (y - oy) - dy * (x - ox) for x, y in zip(xs, ys)]
+        sides = [(c >= EPS) - (c <= -EPS) for c in crosses]
+        cut_xs, cut_ys = [], []
         for i in range(self.n):
-            if (other.p2 - other.p1).ccw(self.points[i] - other.p1) != -1:
-                points.append(self.points[i])
-            seg = Segment(self.points[i], self.points[(i + 1) % self.n])
-            if (self.points[i] - other.p1).ccw(other.p2 - other.p1) * (
-                self.points[(i + 1) % self.n] - other.p1
-            ).ccw(other.p2 - other.p1) < 0:
-                points.append(seg.crossing_point(other))
-        return Polygon(points).convex_hull()
+            j = (i + 1) % self.n
+            if sides[i] != -1:
+                cut_xs.append(xs[i])
+                cut_ys.append(ys[i])
+            if sides[i] * sides[j] < 0:
+                # 辺 ij と直線の交点. 両端の外積の比で辺を内分する
+                t = crosses[i] / (crosses[i] - crosses[j])
+                cut_xs.append(xs[i] + (xs[j] - xs[i]) * t)
+                cut_ys.append(ys[i] + (ys[j] - ys[i]) * t)
+        return Polygon._from_coords(cut_xs, cut_ys).convex_hull()
 
     def area_common_with_circle(self, other: "Circle") -> float:
         """円と多角形の共通部分の面積
@@ -577,27 +827,73 @@ class Polygon:
         Returns:
             float: 共通部分の面積
         """
+        xs, ys, n = self._xs, self._ys, self.n
+        cx, cy, r = other.center.x, other.center.y, other.radius
+
+        # 外接矩形が円と離れていれば共通部分はない
+        nx = min(max(cx, self._xmin), self._xmax)
+        ny = min(max(cy, self._ymin), self._ymax)
+        if (nx - cx) ** 2 + (ny - cy) ** 2 > r**2:
+            return 0
+        # 全ての頂点が円の内側にあれば多角形全体が共通部分
+        if all(hypot(x - cx, y - cy) - r < EPS for x, y in zip(xs, ys)):
+            return self.area()
+
+        # 円の中心と各辺がなす三角形ごとに, 円との共通部分の符号付き面積を足し合わせる.
+        # 座標は円の中心を原点とし, 辺は円との交点で区切って扇形と三角形に分ける
+        r2 = r * r
         area = 0
-        points = []
-        for i in range(self.n):
-            points.append(self.points[i])
-            seg = Segment(self.points[i], self.points[(i + 1) % self.n])
-            for p in other.crossing_points_with_line(seg):
-                if seg.is_including_point(p) and p != seg.p1 and p != seg.p2:
-                    points.append(p)
-        for i in range(len(points)):
-            seg = Segment(points[i], points[(i + 1) % len(points)])
-            dot = (seg.p1 - other.center).dot(seg.p2 - other.center)
-            cross = (seg.p1 - other.center).cross(seg.p2 - other.center)
-            if other.side_of_point(seg.p1) == -1 or other.side_of_point(seg.p2) == -1:
-                theta = atan2(cross, dot)
-                area += other.radius**2 * theta / 2
+        ax, ay = xs[-1] - cx, ys[-1] - cy
+        out_a = hypot(ax, ay) - r >= EPS
+        for i in range(n):
+            bx, by = xs[i] - cx, ys[i] - cy
+            out_b = hypot(bx, by) - r >= EPS
+            if not (out_a or out_b):
+                # 両端が円の内側なら辺全体が内側にある
+                area += (ax * by - ay * bx) / 2
+                ax, ay, out_a = bx, by, out_b
+                continue
+
+            dx, dy = bx - ax, by - ay
+            len2 = dx * dx + dy * dy
+            t = -(ax * dx + ay * dy) / len2
+            dist = hypot(ax + dx * t, ay + dy * t)
+            if equal(dist, r):
+                ts = (t,)
+            elif dist < r:
+                h = ((r2 - dist * dist) / len2) ** 0.5
+                ts = (t - h, t + h)
+            else:
+                ts = ()
+
+            px, py, out_p = ax, ay, out_a
+            for t in ts:
+                if not 0 < t < 1:
+                    continue
+                x, y = ax + dx * t, ay + dy * t
+                if equal(x, ax) and equal(y, ay):
+                    continue
+                if equal(x, bx) and equal(y, by):
+                    continue
+                cross = px * y - py * x
+                if out_p:
+                    area += r2 * atan2(cross, px * x + py * y) / 2
+                else:
+                    area += cross / 2
+                # 交点は円周上にあるので外側ではない
+                px, py, out_p = x, y, False
+            cross = px * by - py * bx
+            if out_p or out_b:
+                area += r2 * atan2(cross, px * bx + py * by) / 2
             else:
                 area += cross / 2
+            ax, ay, out_a = bx, by, out_b
         return abs(area)
 
 
 class Circle:
+    __slots__ = ("center", "radius")
+
     def __init__(self, center: Point, radius: float) -> None:
         assert radius > 0, "radius must be positive"
         self.center = center.copy()
@@ -640,12 +936,7 @@ class Circle:
         Returns:
             int: 1: 内接, 0: 接しない, -1: 外接
         """
-        if equal(abs(self.center - other.center), abs(self.radius - other.radius)):
-            return 1
-        elif equal(abs(self.center - other.center), self.radius + other.radius):
-            return -1
-        else:
-            return 0
+        return self._sides_with_circle(other)[0]
 
     def side_of_aparting_circle(self, other: "Circle") -> int:
         """円同士の関係を判定
@@ -656,14 +947,45 @@ class Circle:
         Returns:
             int: 1: 内部, 0: 交点を1つ以上持つ, -1: 外部
         """
-        if self.side_of_touching_circle(other):
-            return 0
-        elif abs(self.center - other.center) < abs(self.radius - other.radius):
-            return 1
-        elif self.radius + other.radius < abs(self.center - other.center):
-            return -1
+        return self._sides_with_circle(other)[1]
+
+    def side_of_touching_circles(self, others: list["Circle"]) -> list[int]:
+        """複数の円それぞれについて接している側を判定
+
+        Args:
+            others (list[Circle]): 判定対象の円のリスト
+
+        Returns:
+            list[int]: 各円についての side_of_touching_circle の結果
+        """
+        return [self._sides_with_circle(other)[0] for other in others]
+
+    def side_of_aparting_circles(self, others: list["Circle"]) -> list[int]:
+        """複数の円それぞれとの関係を判定
+
+        Args:
+            others (list[Circle]): 判定対象の円のリスト
+
+        Returns:
+            list[int]: 各円についての side_of_aparting_circle の結果
+        """
+        return [self._sides_with_circle(other)[1] for other in others]
+
+    def _sides_with_circle(self, other: "Circle") -> tuple[int, int]:
+        # side_of_touching_circle と side_of_aparting_circle の結果の組.
+        # 中心間の距離は1回だけ計算する
+        dist = hypot(self.center.x - other.center.x, self.center.y - other.center.y)
+        inner, outer = abs(self.radius - other.radius), self.radius + other.radius
+        if equal(dist, inner):
+            return 1, 0
+        elif equal(dist, outer):
+            return -1, 0
+        elif dist < inner:
+            return 0, 1
+        elif outer < dist:
+            return 0, -1
         else:
-            return 0
+            return 0, 0
 
     def crossing_points_with_circle(self, other: "Circle") -> list[Point]:
         """円と円の交点
@@ -674,22 +996,32 @@ class Circle:
         Returns:
             list[Point]: 0~2個の交点を反時計まわりに含むリスト
         """
-        if self.side_of_touching_circle(other) == 1:
-            unit = (other.center - self.center).unit_vector()
+        dx, dy = other.center.x - self.center.x, other.center.y - self.center.y
+        # 明らかに離れている場合と, 一方が他方の真に内側にある場合は平方根を取らずに判定する
+        dist2 = dx * dx + dy * dy
+        if dist2 > (self.radius + other.radius + EPS) ** 2:
+            return []
+        inner = abs(self.radius - other.radius) - EPS
+        if inner > 0 and dist2 < inner * inner:
+            return []
+        touching, aparting = self._sides_with_circle(other)
+        if touching == 1:
+            unit = Point.direction(self.center, other.center)
             if self.radius > other.radius:
                 return [self.center + unit * self.radius]
             else:
                 return [other.center - unit * other.radius]
-        elif self.side_of_touching_circle(other) == -1:
-            unit = (other.center - self.center).unit_vector()
+        elif touching == -1:
+            unit = Point.direction(self.center, other.center)
             return [self.center + unit * self.radius]
-        elif self.side_of_aparting_circle(other) == 0:
-            dist = abs(self.center - other.center)
-            cosine = (self.radius**2 - other.radius**2 + dist**2) / (2 * dist)
+        elif aparting == 0:
+            dist = hypot(dx, dy)
+            cosine = (self.radius**2 - other.radius**2 + dist2) / (2 * dist)
             h = (self.radius**2 - cosine**2) ** 0.5
-            unit = (other.center - self.center).unit_vector()
+            unit = Point.direction(self.center, other.center)
             p = self.center + unit * cosine
-            return [p - unit.rotate(pi / 2) * h, p + unit.rotate(pi / 2) * h]
+            normal = Point(-unit.y * h, unit.x * h)
+            return [p - normal, p + normal]
         else:
             return []
 
@@ -732,7 +1064,7 @@ class Circle:
         if self.is_touching_line(other):
             return [projection]
         dist = abs(projection - self.center)
-        unit = (other.p2 - other.p1).unit_vector()
+        unit = Point.direction(other._p1, other._p2)
         d = (self.radius**2 - dist**2) ** 0.5
         return [projection - unit * d, projection + unit * d]
 
@@ -747,6 +1079,18 @@ class Circle:
         """
         return other.area_common_with_circle(self)
 
+    def area_common_with_polygons(self, others: list[Polygon]) -> list[float]:
+        """複数の多角形それぞれとの共通部分の面積
+
+        Args:
+            others (list[Polygon]): 対象の多角形のリスト
+
+        Returns:
+            list[float]: 各多角形との共通部分の面積
+        """
+        # 外接矩形による判定は area_common_with_circle の中で行う
+        return [other.area_common_with_circle(self) for other in others]
+
     def area_common_with_circle(self, other: "Circle") -> float:
         """円と円の共通部分の面積
 
@@ -756,15 +1100,10 @@ class Circle:
         Returns:
             float: 共通部分の面積
         """
-        if (
-            self.side_of_aparting_circle(other) == 1
-            or self.side_of_touching_circle(other) == 1
-        ):
+        touching, aparting = self._sides_with_circle(other)
+        if aparting == 1 or touching == 1:
             return min(self.area(), other.area())
-        elif (
-            self.side_of_aparting_circle(other) == -1
-            or self.side_of_touching_circle(other) == -1
-        ):
+        elif aparting == -1 or touching == -1:
             return 0
         else:
             p1, p2 = self.crossing_points_with_circle(other)
@@ -796,7 +1135,7 @@ class Circle:
         elif self.side_of_point(other) == 0:
             return [other.copy()]
         else:
-            radius = (abs(other - self.center) ** 2 - self.radius**2) ** 0.5
+            radius = ((other - self.center)._norm2() - self.radius**2) ** 0.5
             return self.crossing_points_with_circle(Circle(other, radius))
 
 
@@ -885,9 +1224,9 @@ class PillowManager:
 
     def draw_polygon(self, polygon: Polygon, width=1, color=(0, 0, 0)) -> None:
         for i in range(polygon.n):
-            p1 = polygon.points[i]
-            p2 = polygon.points[(i + 1) % polygon.n]
-            self.draw_segment(Segment(p1, p2), width, color)
+            p1 = self._convert(polygon._point(i - 1))
+            p2 = self._convert(polygon._point(i))
+            self.draw.line((p1.x, p1.y, p2.x, p2.y), fill=color, width=width)
 
     def draw_circle(self, circle: Circle, color=(0, 0, 0)) -> None:
         lb = self._convert(circle.center - Point(circle.radius, circle.radius))
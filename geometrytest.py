@@ -1,112 +1,120 @@
 import unittest
+from math import cos, pi, sin
 from geometry import Point, Segment, Line, Polygon, Circle
 
+# 多くのケースで使う点. ライブラリは引数の点を書き換えないので共有してよい
+P00 = Point(0, 0)
+P10 = Point(1, 0)
+P20 = Point(2, 0)
+P01 = Point(0, 1)
+P11 = Point(1, 1)
+
 
 # https://onlinejudge.u-aizu.ac.jp/courses/library/4/CGL/all のサンプルケースのチェック.
 # 5_A, 6_A, 7_G は未対応.
 class TestBasicGeometry(unittest.TestCase):
     def test_1_A_Projection(self):
-        l1 = Line(Point(0, 0), Point(3, 4))
+        l1 = Line(P00, Point(3, 4))
         self.assertEqual(l1.projection(Point(2, 5)), Point(3.12, 4.16))
-        l2 = Line(Point(0, 0), Point(2, 0))
+        l2 = Line(P00, P20)
         self.assertEqual(l2.projection(Point(-1, 1)), Point(-1, 0))
-        self.assertEqual(l2.projection(Point(0, 1)), Point(0, 0))
-        self.assertEqual(l2.projection(Point(1, 1)), Point(1, 0))
+        self.assertEqual(l2.projection(P01), P00)
+        self.assertEqual(l2.projection(P11), P10)
 
     def test_1_B_Reflection(self):
-        l1 = Line(Point(0, 0), Point(3, 4))
+        l1 = Line(P00, Point(3, 4))
         self.assertEqual(l1.reflection(Point(2, 5)), Point(4.24, 3.32))
         self.assertEqual(l1.reflection(Point(1, 4)), Point(3.56, 2.08))
         self.assertEqual(l1.reflection(Point(0, 3)), Point(2.88, 0.84))
-        l2 = Line(Point(0, 0), Point(2, 0))
+        l2 = Line(P00, P20)
         self.assertEqual(l2.reflection(Point(-1, 1)), Point(-1, -1))
-        self.assertEqual(l2.reflection(Point(0, 1)), Point(0, -1))
-        self.assertEqual(l2.reflection(Point(1, 1)), Point(1, -1))
+        self.assertEqual(l2.reflection(P01), Point(0, -1))
+        self.assertEqual(l2.reflection(P11), Point(1, -1))
 
     def test_1_C_CounterClockWise(self):
-        v1 = Point(2, 0)
+        v1 = P20
         self.assertEqual(v1.ccw(Point(-1, 1)), 1)
         self.assertEqual(v1.ccw(Point(-1, -1)), -1)
         self.assertEqual(v1.ccw(Point(-1, 0)), 0)
-        self.assertEqual(v1.ccw(Point(0, 0)), 0)
+        self.assertEqual(v1.ccw(P00), 0)
         self.assertEqual(v1.ccw(Point(3, 0)), 0)
 
     def test_2_A_Parallel_Orthogonal(self):
-        l = Line(Point(0, 0), Point(3, 0))
+        l = Line(P00, Point(3, 0))
         self.assertEqual(l.is_parallel(Line(Point(0, 2), Point(3, 2))), True)
-        self.assertEqual(l.is_orthogonal(Line(Point(1, 1), Point(1, 4))), True)
-        self.assertEqual(l.is_parallel(Line(Point(1, 1), Point(2, 2))), False)
-        self.assertEqual(l.is_orthogonal(Line(Point(1, 1), Point(2, 2))), False)
+        self.assertEqual(l.is_orthogonal(Line(P11, Point(1, 4))), True)
+        self.assertEqual(l.is_parallel(Line(P11, Point(2, 2))), False)
+        self.assertEqual(l.is_orthogonal(Line(P11, Point(2, 2))), False)
 
     def test_2_B_intersection(self):
-        s = Segment(Point(0, 0), Point(3, 0))
-        self.assertEqual(s.is_crossing(Segment(Point(1, 1), Point(2, -1))), True)
+        s = Segment(P00, Point(3, 0))
+        self.assertEqual(s.is_crossing(Segment(P11, Point(2, -1))), True)
         self.assertEqual(s.is_crossing(Segment(Point(3, 1), Point(3, -1))), True)
         self.assertEqual(s.is_crossing(Segment(Point(3, -2), Point(5, 0))), False)
 
     def test_2_C_CrossPoint(self):
         self.assertEqual(
-            Segment(Point(0, 0), Point(2, 0)).crossing_point(
-                Segment(Point(1, 1), Point(1, -1))
-            ),
-            Point(1, 0),
+            Segment(P00, P20).crossing_point(Segment(P11, Point(1, -1))),
+            P10,
         )
         self.assertEqual(
-            Segment(Point(0, 0), Point(1, 1)).crossing_point(
-                Segment(Point(0, 1), Point(1, 0))
-            ),
+            Segment(P00, P11).crossing_point(Segment(P01, P10)),
             Point(0.5, 0.5),
         )
         self.assertEqual(
-            Segment(Point(0, 0), Point(1, 1)).crossing_point(
-                Segment(Point(1, 0), Point(0, 1))
-            ),
+            Segment(P00, P11).crossing_point(Segment(P10, P01)),
             Point(0.5, 0.5),
         )
 
     def test_2_D_Distance(self):
         self.assertAlmostEqual(
-            Segment(Point(0, 0), Point(1, 0)).distance_to_segment(
-                Segment(Point(0, 1), Point(1, 1))
-            ),
+            Segment(P00, P10).distance_to_segment(Segment(P01, P11)),
             1,
         )
         self.assertAlmostEqual(
-            Segment(Point(0, 0), Point(1, 0)).distance_to_segment(
-                Segment(Point(2, 1), Point(1, 2))
-            ),
+            Segment(P00, P10).distance_to_segment(Segment(Point(2, 1), Point(1, 2))),
             1.4142135624,
         )
         self.assertAlmostEqual(
-            Segment(Point(-1, 0), Point(1, 0)).distance_to_segment(
-                Segment(Point(0, 1), Point(0, -1))
-            ),
+            Segment(Point(-1, 0), P10).distance_to_segment(Segment(P01, Point(0, -1))),
             0,
         )
 
     def test_3_A_Area(self):
-        p1 = Polygon([Point(0, 0), Point(2, 2), Point(-1, 1)])
+        p1 = Polygon([P00, Point(2, 2), Point(-1, 1)])
         self.assertAlmostEqual(p1.area(), 2)
-        p2 = Polygon([Point(0, 0), Point(1, 1), Point(1, 2), Point(0, 2)])
+        p2 = Polygon([P00, P11, Point(1, 2), Point(0, 2)])
         self.assertAlmostEqual(p2.area(), 1.5)
+        # 原点から遠い位置に平行移動しても面積は変わらない
+        p3 = Polygon(
+            [
+                Point(10 * cos(2 * pi * i / 200), 10 * sin(2 * pi * i / 200))
+                for i in range(200)
+            ]
+        )
+        p4 = Polygon([p.move(1e6, 1e6) for p in p3.points])
+        self.assertAlmostEqual(p4.area(), p3.area(), places=6)
 
     def test_3_B_Is_Convex(self):
-        p1 = Polygon([Point(0, 0), Point(3, 1), Point(2, 3), Point(0, 3)])
+        p1 = Polygon([P00, Point(3, 1), Point(2, 3), Point(0, 3)])
         self.assertEqual(p1.is_convex(), True)
-        p2 = Polygon([Point(0, 0), Point(2, 0), Point(1, 1), Point(2, 2), Point(0, 2)])
+        p2 = Polygon([P00, P20, P11, Point(2, 2), Point(0, 2)])
         self.assertEqual(p2.is_convex(), False)
 
     def test_3_C_Polygon_Point_Containment(self):
-        p1 = Polygon([Point(0, 0), Point(3, 1), Point(2, 3), Point(0, 3)])
+        p1 = Polygon([P00, Point(3, 1), Point(2, 3), Point(0, 3)])
         self.assertEqual(p1.side_of_point(Point(2, 1)), 1)
         self.assertEqual(p1.side_of_point(Point(0, 2)), 0)
         self.assertEqual(p1.side_of_point(Point(3, 2)), -1)
+        self.assertListEqual(
+            p1.side_of_points([Point(2, 1), Point(0, 2), Point(3, 2)]), [1, 0, -1]
+        )
 
     def test_4_A_Convex_Hull(self):
         p = Polygon(
             [
                 Point(2, 1),
-                Point(0, 0),
+                P00,
                 Point(1, 2),
                 Point(2, 2),
                 Point(4, 2),
@@ -114,20 +122,52 @@ class TestBasicGeometry(unittest.TestCase):
                 Point(3, 3),
             ]
         )
-        ch = Polygon([Point(0, 0), Point(2, 1), Point(4, 2), Point(3, 3), Point(1, 3)])
+        ch = Polygon([P00, Point(2, 1), Point(4, 2), Point(3, 3), Point(1, 3)])
+        self.assertListEqual(p.convex_hull().points, ch.points)
+        # 9点以上では八角形による前処理を通る. 内部の点, 辺上の点, 重複した端点を含む
+        p = Polygon(
+            [
+                P00,
+                P20,
+                Point(4, 0),
+                Point(4, 2),
+                Point(4, 4),
+                Point(2, 4),
+                Point(0, 4),
+                Point(0, 2),
+                P11,
+                Point(2, 2),
+                Point(3, 1),
+                Point(1, 3),
+                Point(4, 4),
+                Point(3, 3),
+            ]
+        )
+        ch = Polygon(
+            [
+                P00,
+                P20,
+                Point(4, 0),
+                Point(4, 2),
+                Point(4, 4),
+                Point(2, 4),
+                Point(0, 4),
+                Point(0, 2),
+            ]
+        )
         self.assertListEqual(p.convex_hull().points, ch.points)
 
     def test_4_B_Diameter_of_a_Convex_Polygon(self):
-        p1 = Polygon([Point(0, 0), Point(4, 0), Point(2, 2)])
+        p1 = Polygon([P00, Point(4, 0), Point(2, 2)])
         self.assertAlmostEqual(p1.diameter(), 4)
-        p2 = Polygon([Point(0, 0), Point(1, 0), Point(1, 1), Point(0, 1)])
+        p2 = Polygon([P00, P10, P11, P01])
         self.assertAlmostEqual(p2.diameter(), 1.414213562373)
 
     def test_4_C_Convex_Cut(self):
-        p = Polygon([Point(1, 1), Point(4, 1), Point(4, 3), Point(1, 3)])
-        l1 = Line(Point(2, 0), Point(2, 4))
+        p = Polygon([P11, Point(4, 1), Point(4, 3), Point(1, 3)])
+        l1 = Line(P20, Point(2, 4))
         self.assertAlmostEqual(p.convex_cut_with_line(l1).area(), 2)
-        l2 = Line(Point(2, 4), Point(2, 0))
+        l2 = Line(Point(2, 4), P20)
         self.assertAlmostEqual(p.convex_cut_with_line(l2).area(), 4)
 
     def test_5_A_Closest_Pair(self):
@@ -137,37 +177,26 @@ class TestBasicGeometry(unittest.TestCase):
         pass
 
     def test_7_A_Intersection(self):
-        self.assertEqual(
-            Circle(Point(1, 1), 1).side_of_aparting_circle(Circle(Point(6, 2), 2)),
-            -1,
-        )
-        self.assertEqual(
-            Circle(Point(1, 1), 1).side_of_touching_circle(Circle(Point(6, 2), 2)), 0
-        )
-        self.assertEqual(
-            Circle(Point(1, 2), 1).side_of_aparting_circle(Circle(Point(4, 2), 2)), 0
-        )
-        self.assertEqual(
-            Circle(Point(1, 2), 1).side_of_touching_circle(Circle(Point(4, 2), 2)), -1
-        )
-        self.assertEqual(
-            Circle(Point(1, 2), 1).side_of_aparting_circle(Circle(Point(3, 2), 2)), 0
-        )
-        self.assertEqual(
-            Circle(Point(1, 2), 1).side_of_touching_circle(Circle(Point(3, 2), 2)), 0
-        )
-        self.assertEqual(
-            Circle(Point(0, 0), 1).side_of_aparting_circle(Circle(Point(1, 0), 2)), 0
-        )
-        self.assertEqual(
-            Circle(Point(0, 0), 1).side_of_touching_circle(Circle(Point(1, 0), 2)), 1
-        )
-        self.assertEqual(
-            Circle(Point(0, 0), 1).side_of_aparting_circle(Circle(Point(0, 0), 2)), 1
-        )
-        self.assertEqual(
-            Circle(Point(0, 0), 1).side_of_touching_circle(Circle(Point(0, 0), 2)), 0
-        )
+        # (円1, 円2, side_of_aparting_circle, side_of_touching_circle)
+        cases = [
+            (Circle(P11, 1), Circle(Point(6, 2), 2), -1, 0),
+            (Circle(Point(1, 2), 1), Circle(Point(4, 2), 2), 0, -1),
+            (Circle(Point(1, 2), 1), Circle(Point(3, 2), 2), 0, 0),
+            (Circle(P00, 1), Circle(P10, 2), 0, 1),
+            (Circle(P00, 1), Circle(P00, 2), 1, 0),
+        ]
+        for c1, c2, aparting, touching in cases:
+            with self.subTest(c1=str(c1), c2=str(c2)):
+                self.assertEqual(c1.side_of_aparting_circle(c2), aparting)
+                self.assertEqual(c1.side_of_touching_circle(c2), touching)
+        c = Circle(Point(1, 2), 1)
+        others = [
+            Circle(Point(6, 2), 2),
+            Circle(Point(4, 2), 2),
+            Circle(Point(3, 2), 2),
+        ]
+        self.assertListEqual(c.side_of_aparting_circles(others), [-1, 0, 0])
+        self.assertListEqual(c.side_of_touching_circles(others), [0, -1, 0])
 
     def test_7_B_Incircle_of_a_Triangle(self):
         p1 = Point(1, -2)
@@ -183,11 +212,11 @@ class TestBasicGeometry(unittest.TestCase):
 
         p1 = Point(0, 3)
         p2 = Point(4, 0)
-        p3 = Point(0, 0)
+        p3 = P00
         l1 = Line(p1, p1 + ((p2 - p1).unit_vector() + (p3 - p1).unit_vector()) / 2)
         l2 = Line(p2, p2 + ((p1 - p2).unit_vector() + (p3 - p2).unit_vector()) / 2)
         center = l1.crossing_point(l2)
-        self.assertEqual(center, Point(1, 1))
+        self.assertEqual(center, P11)
         self.assertAlmostEqual(Line(p1, p2).distance_to_point(center), 1)
 
     def test_7_C_Circumcircle_of_a_Triangle(self):
@@ -200,24 +229,23 @@ class TestBasicGeometry(unittest.TestCase):
 
         p1 = Point(0, 3)
         p2 = Point(4, 0)
-        p3 = Point(0, 0)
+        p3 = P00
         center = Segment(p1, p2).bisecter().crossing_point(Segment(p2, p3).bisecter())
         self.assertEqual(center, Point(2, 1.5))
         self.assertAlmostEqual(abs(center - p1), 2.5)
 
     def test_7_D_CrossPoint_of_Cirle_and_Line(self):
         c = Circle(Point(2, 1), 1)
-        p1, p2 = c.crossing_points_with_line(Line(Point(0, 1), Point(4, 1)))
+        p1, p2 = c.crossing_points_with_line(Line(P01, Point(4, 1)))
         self.assertTrue(
-            (p1 == Point(3, 1) and p2 == Point(1, 1))
-            or (p1 == Point(1, 1) and p2 == Point(3, 1))
+            (p1 == Point(3, 1) and p2 == P11) or (p1 == P11 and p2 == Point(3, 1))
         )
         p3 = c.crossing_points_with_line(Line(Point(3, 0), Point(3, 3)))[0]
         self.assertEqual(p3, Point(3, 1))
 
     def test_7_E_CrossPoint_of_Circles(self):
-        c = Circle(Point(0, 0), 2)
-        c1 = Circle(Point(2, 0), 2)
+        c = Circle(P00, 2)
+        c1 = Circle(P20, 2)
         p1, p2 = c.crossing_points_with_circle(c1)
         self.assertTrue(
             (p1 == Point(1, -1.73205080) and p2 == Point(1, 1.73205080))
@@ -228,45 +256,158 @@ class TestBasicGeometry(unittest.TestCase):
         self.assertEqual(p3, Point(0, 2))
 
     def test_7_F_Tangent_to_Circle(self):
-        p = Point(0, 0)
+        p = P00
         c = Circle(Point(2, 2), 2)
         p1, p2 = c.touching_points_with_tangent(p)
         self.assertTrue(
-            (p1 == Point(0, 2) and p2 == Point(2, 0))
-            or (p1 == Point(2, 0) and p2 == Point(0, 2))
+            (p1 == Point(0, 2) and p2 == P20) or (p1 == P20 and p2 == Point(0, 2))
         )
 
         p = Point(-3, 0)
         c = Circle(Point(2, 2), 2)
         p1, p2 = c.touching_points_with_tangent(p)
         self.assertTrue(
-            (p1 == Point(0.6206896552, 3.4482758621) and p2 == Point(2, 0))
-            or (p1 == Point(2, 0) and p2 == Point(0.6206896552, 3.4482758621))
+            (p1 == Point(0.6206896552, 3.4482758621) and p2 == P20)
+            or (p1 == P20 and p2 == Point(0.6206896552, 3.4482758621))
         )
 
     def test_7_G_Common_Tangent(self):
         pass
 
     def test_7_H_Intersection_of_Circle_and_Polygon(self):
-        c = Circle(Point(0, 0), 5)
-        p1 = Polygon([Point(1, 1), Point(4, 1), Point(5, 5)])
+        c = Circle(P00, 5)
+        p1 = Polygon([P11, Point(4, 1), Point(5, 5)])
         self.assertAlmostEqual(c.area_common_with_polygon(p1), 4.639858417607)
         self.assertAlmostEqual(p1.area_common_with_circle(c), 4.639858417607)
-        p2 = Polygon([Point(0, 0), Point(-3, -6), Point(1, -3), Point(5, -4)])
+        p2 = Polygon([P00, Point(-3, -6), Point(1, -3), Point(5, -4)])
         self.assertAlmostEqual(c.area_common_with_polygon(p2), 11.787686807576)
         self.assertAlmostEqual(p2.area_common_with_circle(c), 11.787686807576)
+        p3 = Polygon([Point(6, 6), Point(7, 6), Point(7, 7)])
+        for area, expected in zip(
+            c.area_common_with_polygons([p1, p2, p3]),
+            [4.639858417607, 11.787686807576, 0],
+        ):
+            self.assertAlmostEqual(area, expected)
 
     def test_7_I_Intersection_of_Circles(self):
-        c1 = Circle(Point(0, 0), 1)
-        c2 = Circle(Point(2, 0), 2)
+        c1 = Circle(P00, 1)
+        c2 = Circle(P20, 2)
         self.assertAlmostEqual(c1.area_common_with_circle(c2), 1.40306643968573875104)
         self.assertAlmostEqual(c2.area_common_with_circle(c1), 1.40306643968573875104)
 
-        c1 = Circle(Point(1, 0), 1)
-        c2 = Circle(Point(0, 0), 3)
+        c1 = Circle(P10, 1)
+        c2 = Circle(P00, 3)
         self.assertAlmostEqual(c1.area_common_with_circle(c2), 3.14159265358979311600)
         self.assertAlmostEqual(c2.area_common_with_circle(c1), 3.14159265358979311600)
 
 
+# AOJ のサンプルにはない, 高速化で壊れやすいケースのチェック.
+class TestRegression(unittest.TestCase):
+    def test_convex_common(self):
+        # 期待値は有理数で厳密に計算した面積
+        p1 = Polygon(
+            [
+                Point(0, -5),
+                Point(2, 1),
+                Point(3, 5),
+                Point(-2, 5),
+                Point(-5, 5),
+                Point(-4, -2),
+            ]
+        )
+        p2 = Polygon(
+            [
+                Point(-1, -5),
+                Point(0, -5),
+                Point(3, -1),
+                Point(5, 2),
+                Point(-3, 3),
+                Point(-4, -2),
+            ]
+        )
+        self.assertAlmostEqual(p1.convex_common(p2).area(), 193 / 6)
+        self.assertAlmostEqual(p2.convex_common(p1).area(), 193 / 6)
+        # 隣り合わない位置に重複した頂点があっても凸包は折り返さない
+        p3 = Polygon(
+            [
+                P00,
+                Point(4, 0),
+                Point(4, 4),
+                Point(0, 4),
+                Point(4, 0),
+            ]
+        )
+        p4 = Polygon(
+            [
+                Point(2, -1),
+                Point(5, -1),
+                Point(5, 5),
+                Point(2, 5),
+                Point(2, -1),
+                Point(5, 5),
+            ]
+        )
+        self.assertEqual(p3.convex_hull().n, 4)
+        self.assertAlmostEqual(p3.convex_common(p4).area(), 8)
+        self.assertAlmostEqual(p4.convex_common(p3).area(), 8)
+
+    def test_crossing_point_out_of_range(self):
+        s1 = Segment(P00, P20)
+        self.assertIsNone(s1.crossing_point(Segment(Point(3, -1), Point(3, 1))))
+        self.assertIsNone(s1.crossing_point(Segment(Point(1, 1), Point(1, 2))))
+        self.assertIsNone(Line(P00, P20).crossing_point(Segment(P11, Point(2, 2))))
+
+    def test_convex_common_near_tangent(self):
+        # ほぼ平行な辺の端点が誤差の範囲で相手の辺に乗っていても交点を求められる
+        p1 = Polygon([P00, Point(1000, 0), Point(1000, 1000), Point(0, 1000)])
+        p2 = Polygon(
+            [Point(500, 5e-12), Point(600, 1e-6), Point(600, 100), Point(500, 100)]
+        )
+        self.assertAlmostEqual(p1.convex_common(p2).area(), 10000.024950125, places=6)
+
+    def test_polygon_rotate(self):
+        p = Polygon([P00, Point(3, 1), Point(2, 3), Point(0, 3)])
+        origin = Point(1, 2)
+        for theta in [0.3, pi / 2, -pi / 2, pi, 2.5]:
+            with self.subTest(theta=theta):
+                self.assertListEqual(
+                    p.rotate(theta).points, [v.rotate(theta) for v in p.points]
+                )
+                self.assertListEqual(
+                    p.rotate(theta, origin).points,
+                    [v.rotate(theta, origin) for v in p.points],
+                )
+
+    def test_line_keeps_own_points(self):
+        # 生成後に引数の点を書き換えても, 線分や円は影響を受けない
+        a = Point(0, 0)
+        s = Segment(a, Point(4, 0))
+        c = Circle(a, 1)
+        a.x = 2
+        self.assertEqual(s.p1, P00)
+        self.assertAlmostEqual(abs(s), 4)
+        self.assertTrue(s.is_including_point(P10))
+        self.assertEqual(c.center, P00)
+        with self.assertRaises(AttributeError):
+            s.p1 = P10
+        # 取り出した端点を書き換えても線分は変わらない
+        s.p1.x = 2
+        self.assertEqual(s.p1, P00)
+        self.assertAlmostEqual(abs(s), 4)
+        self.assertFalse(s.is_including_point(Point(5, 0)))
+
+    def test_point_direction(self):
+        p1, p2 = Point(1, -2), Point(3, 2)
+        self.assertEqual(Point.direction(p1, p2), (p2 - p1).unit_vector())
+        self.assertEqual(Point.direction(P00, Point(3, 4)), Point(0.6, 0.8))
+        # 同じ点の場合は (0, 0)
+        self.assertEqual(Point.direction(P11, P11), P00)
+
+    def test_polygon_points_cached(self):
+        p = Polygon([P00, P10, P11, P01])
+        self.assertIs(p.points, p.points)
+        self.assertListEqual([p.points[i] for i in range(p.n)], [P00, P10, P11, P01])
+
+
 if __name__ == "__main__":
     unittest.main()